@@ -10,7 +10,6 @@ Platform priority: Windows. macOS/Linux best-effort with documented flags.
 Dependencies (Python):
 - keyboard (global hotkeys, Windows-friendly) OR pynput as fallback
 - screeninfo (primary monitor detection)
-- psutil (disk usage)
 
 System dependency: FFmpeg (ffmpeg must be available in PATH)
 
@@ -24,32 +23,32 @@ Hotkeys:
 Notes:
 - Run from an elevated Command Prompt on Windows for reliable hotkey capture in fullscreen games.
 - Cursor flicker is minimized using gdigrab (Windows) with explicit framerate and draw_mouse.
-  If your FFmpeg build supports ddagrab, see README for an alternative command template.
+  If your FFmpeg build supports ddagrab, it is used instead (see README).
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
+import collections
 import datetime as dt
+import functools
+import itertools
+import json
 import logging
 import os
 import platform
 import re
 import shutil
 import signal
+import stat
 import subprocess
 import sys
-import tempfile
 import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
-
-try:
-    import psutil  # type: ignore
-except Exception:  # pragma: no cover - optional import error will surface later
-    psutil = None
+from typing import Any, Callable, Deque, List, Optional, Set, Tuple
 
 # Hotkey backend: prefer keyboard; fallback to pynput
 try:  # pragma: no cover - tested via import success only
@@ -62,22 +61,42 @@ except Exception:  # pragma: no cover
     except Exception:
         _HOTKEY_BACKEND = "none"
 
-# Monitor detection
-try:  # pragma: no cover - tested via import success only
-    from screeninfo import get_monitors  # type: ignore
-except Exception:
-    get_monitors = None  # type: ignore
-
 APP_NAME = "Clipper"
 DEFAULT_BUFFER_SECS = 120
 DEFAULT_SEGMENT_SECS = 10
 DEFAULT_FRAMERATE = 60
+DEFAULT_BITRATE = "20M"
+
+# Hardware H.264 encoders preferred over libx264, in priority order
+HW_ENCODERS = ("h264_nvenc", "h264_qsv", "h264_amf", "h264_videotoolbox")
+# Encoder preset used when --preset is not given
+DEFAULT_PRESETS = {"libx264": "veryfast", "h264_nvenc": "p4", "h264_qsv": "veryfast"}
+# Encoders that accept ddagrab's D3D11 frames without a copy to system memory
+D3D11_ENCODER_SUFFIXES = ("_nvenc", "_amf")
+
+_SYSTEM = platform.system().lower()
+_IS_WINDOWS = _SYSTEM == "windows"
+# Keep FFmpeg from flashing a console window on Windows (the flag only exists there)
+_CREATIONFLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0) if _IS_WINDOWS else 0
 
 ROOT = Path(__file__).resolve().parent
 BUFFER_DIR = ROOT / "buffer"
+# Shared tmpfs used for the ring buffer on Linux when $XDG_RUNTIME_DIR is unavailable
+SHM_DIR = Path("/dev/shm")
+# Worst-case segment data rate used to size the buffer (~50 Mbit/s, high-motion 1080p60)
+BUFFER_BYTES_PER_SEC = 50_000_000 // 8
 CLIPS_DIR = ROOT / "clips"
 LOGS_DIR = ROOT / "logs"
 LOG_FILE = ROOT / "logs.txt"
+CAP_CACHE_FILE = LOGS_DIR / ".cap_cache.json"
+
+# Ring buffer segment names written by the recorder (buf-%05d.ts)
+_SEGMENT_RE = re.compile(r"buf-(\d+)\.ts")
+# Video encoder names in `ffmpeg -encoders` output
+_ENCODER_LINE_RE = re.compile(r"^\s*V\S*\s+(\S+)", re.MULTILINE)
+# Filename sanitization
+_WS_RE = re.compile(r"\s+")
+_BAD_RE = re.compile(r"[^\w\-\. ]+")
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -107,11 +126,11 @@ def which_ffmpeg() -> Optional[str]:
     try:
         exe_dir = Path(sys.executable).parent if getattr(sys, "frozen", False) else ROOT
         candidates = [
-            exe_dir / ("ffmpeg.exe" if platform.system().lower() == "windows" else "ffmpeg"),
+            exe_dir / ("ffmpeg.exe" if _IS_WINDOWS else "ffmpeg"),
         ]
         meipass = getattr(sys, "_MEIPASS", None)
         if meipass:
-            candidates.append(Path(meipass) / ("ffmpeg.exe" if platform.system().lower() == "windows" else "ffmpeg"))
+            candidates.append(Path(meipass) / ("ffmpeg.exe" if _IS_WINDOWS else "ffmpeg"))
         for c in candidates:
             if c and c.exists():
                 return str(c)
@@ -120,7 +139,126 @@ def which_ffmpeg() -> Optional[str]:
     return shutil.which("ffmpeg")
 
 
-@dataclass
+def _free_bytes(path: Path) -> int:
+    """Free space on the volume holding ``path`` (a single statvfs/GetDiskFreeSpaceExW call)."""
+    return shutil.disk_usage(path).free
+
+
+def _ffmpeg_output(ffmpeg_path: str, *args: str) -> str:
+    return subprocess.run(
+        [ffmpeg_path, "-hide_banner", *args],
+        capture_output=True,
+        text=True,
+        timeout=5,
+        creationflags=_CREATIONFLAGS,
+    ).stdout
+
+
+def _load_cap_cache(key: List[Any]) -> dict:
+    try:
+        cache = json.loads(CAP_CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"key": key}
+    if not isinstance(cache, dict) or cache.get("key") != key:
+        return {"key": key}
+    return cache
+
+
+def _cached_probe(ffmpeg_path: str, name: str, probe: Callable[[], Any]) -> Any:
+    """Return ``probe()``, memoized in CAP_CACHE_FILE for this exact ffmpeg binary.
+    The cache is keyed on the binary's path, mtime and size, so replacing FFmpeg invalidates
+    it. Only facts that depend on the binary alone (its encoder and filter lists) belong
+    here; whether the hardware works is checked on every launch.
+    """
+    try:
+        st = os.stat(ffmpeg_path)
+    except OSError:
+        return probe()
+    key = [os.path.abspath(ffmpeg_path), st.st_mtime_ns, st.st_size]
+    cache = _load_cap_cache(key)
+    if name in cache:
+        return cache[name]
+
+    value = probe()
+    # Re-read before writing so entries stored since the load above are kept
+    cache = _load_cap_cache(key)
+    cache[name] = value
+    try:
+        CAP_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CAP_CACHE_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache), encoding="utf-8")
+        os.replace(tmp, CAP_CACHE_FILE)
+    except OSError:
+        pass
+    return value
+
+
+def _probe_encoders(ffmpeg_path: str) -> List[str]:
+    return _cached_probe(ffmpeg_path, "encoders", lambda: _ENCODER_LINE_RE.findall(_ffmpeg_output(ffmpeg_path, "-encoders")))
+
+
+def _probe_filters(ffmpeg_path: str) -> List[str]:
+    def probe() -> List[str]:
+        out = _ffmpeg_output(ffmpeg_path, "-filters")
+        return [parts[1] for parts in (line.split() for line in out.splitlines()) if len(parts) > 1]
+
+    return _cached_probe(ffmpeg_path, "filters", probe)
+
+
+def _encoder_works(ffmpeg_path: str, encoder: str) -> bool:
+    """Encode a single black frame to check that the encoder's hardware is actually present."""
+    cmd = [
+        ffmpeg_path,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-f",
+        "lavfi",
+        "-i",
+        "color=c=black:s=256x256:d=0.1",
+        "-frames:v",
+        "1",
+        "-c:v",
+        encoder,
+        "-f",
+        "null",
+        "-",
+    ]
+    try:
+        res = subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=10,
+            creationflags=_CREATIONFLAGS,
+        )
+        return res.returncode == 0
+    except Exception:
+        return False
+
+
+def detect_hw_encoder(ffmpeg_path: str, fallback: str = "libx264") -> str:
+    """Pick the first hardware H.264 encoder from HW_ENCODERS usable on this machine.
+    FFmpeg builds commonly list encoders for GPUs that are not installed, so each listed
+    candidate is confirmed with a one-frame test encode on every launch, so a driver that
+    starts (or stops) working is picked up. Returns ``fallback`` if none work.
+    """
+    try:
+        listed = set(_probe_encoders(ffmpeg_path))
+        return next((enc for enc in HW_ENCODERS if enc in listed and _encoder_works(ffmpeg_path, enc)), fallback)
+    except Exception:
+        return fallback
+
+
+def ffmpeg_has_filter(ffmpeg_path: str, name: str) -> bool:
+    """Whether this FFmpeg build provides the given filter (e.g. the ddagrab source)."""
+    try:
+        return name in _probe_filters(ffmpeg_path)
+    except Exception:
+        return False
+
+
+@dataclass(frozen=True)
 class MonitorRegion:
     width: int
     height: int
@@ -128,13 +266,21 @@ class MonitorRegion:
     offset_y: int
 
 
+_FALLBACK_REGION = MonitorRegion(1920, 1080, 0, 0)
+
+
+@functools.lru_cache(maxsize=1)
 def detect_primary_monitor() -> MonitorRegion:
     """Detect the primary monitor region (width, height, offset_x, offset_y).
     Uses screeninfo when available; falls back to common 1920x1080 at (0,0).
+    screeninfo is imported on first call (its platform backend is slow to load) and the
+    result is cached.
     """
-    if get_monitors is None:
+    try:
+        from screeninfo import get_monitors  # type: ignore
+    except Exception:
         logging.warning("screeninfo not installed; assuming 1920x1080 at (0,0)")
-        return MonitorRegion(1920, 1080, 0, 0)
+        return _FALLBACK_REGION
 
     try:
         mons = get_monitors()
@@ -154,14 +300,166 @@ def detect_primary_monitor() -> MonitorRegion:
         return MonitorRegion(width, height, offset_x, offset_y)
     except Exception as e:  # pragma: no cover - depends on environment
         logging.exception("Failed to detect primary monitor: %s", e)
-        return MonitorRegion(1920, 1080, 0, 0)
+        return _FALLBACK_REGION
+
+
+class _XcbTitleReader:
+    """Reads the active window title over one persistent XCB connection (libxcb via ctypes).
+    The connection, root window and atoms are set up once, so each lookup is a couple of
+    X round trips instead of forking xprop/awk/sed.
+    """
+
+    _ATOM_STRING = 31
+    _ATOM_WINDOW = 33
+    _ATOM_WM_NAME = 39
+
+    def __init__(self) -> None:
+        import ctypes
+        import ctypes.util
+
+        class Cookie(ctypes.Structure):
+            _fields_ = [("sequence", ctypes.c_uint)]
+
+        class InternAtomReply(ctypes.Structure):
+            _fields_ = [
+                ("response_type", ctypes.c_uint8),
+                ("pad0", ctypes.c_uint8),
+                ("sequence", ctypes.c_uint16),
+                ("length", ctypes.c_uint32),
+                ("atom", ctypes.c_uint32),
+            ]
+
+        class GetPropertyReply(ctypes.Structure):
+            _fields_ = [
+                ("response_type", ctypes.c_uint8),
+                ("format", ctypes.c_uint8),
+                ("sequence", ctypes.c_uint16),
+                ("length", ctypes.c_uint32),
+                ("type", ctypes.c_uint32),
+                ("bytes_after", ctypes.c_uint32),
+                ("value_len", ctypes.c_uint32),
+                ("pad0", ctypes.c_uint8 * 12),
+            ]
+
+        class ScreenIterator(ctypes.Structure):
+            # data points at an xcb_screen_t, whose first field is the root window id
+            _fields_ = [("data", ctypes.POINTER(ctypes.c_uint32)), ("rem", ctypes.c_int), ("index", ctypes.c_int)]
+
+        self._ctypes = ctypes
+        xcb = ctypes.CDLL(ctypes.util.find_library("xcb") or "libxcb.so.1")
+        libc = ctypes.CDLL(ctypes.util.find_library("c"))
+        vp, u8, u16, u32 = ctypes.c_void_p, ctypes.c_uint8, ctypes.c_uint16, ctypes.c_uint32
+
+        xcb.xcb_connect.argtypes = [ctypes.c_char_p, ctypes.POINTER(ctypes.c_int)]
+        xcb.xcb_connect.restype = vp
+        xcb.xcb_connection_has_error.argtypes = [vp]
+        xcb.xcb_connection_has_error.restype = ctypes.c_int
+        xcb.xcb_disconnect.argtypes = [vp]
+        xcb.xcb_disconnect.restype = None
+        xcb.xcb_get_setup.argtypes = [vp]
+        xcb.xcb_get_setup.restype = vp
+        xcb.xcb_setup_roots_iterator.argtypes = [vp]
+        xcb.xcb_setup_roots_iterator.restype = ScreenIterator
+        xcb.xcb_screen_next.argtypes = [ctypes.POINTER(ScreenIterator)]
+        xcb.xcb_screen_next.restype = None
+        xcb.xcb_intern_atom.argtypes = [vp, u8, u16, ctypes.c_char_p]
+        xcb.xcb_intern_atom.restype = Cookie
+        xcb.xcb_intern_atom_reply.argtypes = [vp, Cookie, ctypes.POINTER(vp)]
+        xcb.xcb_intern_atom_reply.restype = ctypes.POINTER(InternAtomReply)
+        xcb.xcb_get_property.argtypes = [vp, u8, u32, u32, u32, u32, u32]
+        xcb.xcb_get_property.restype = Cookie
+        xcb.xcb_get_property_reply.argtypes = [vp, Cookie, ctypes.POINTER(vp)]
+        xcb.xcb_get_property_reply.restype = ctypes.POINTER(GetPropertyReply)
+        xcb.xcb_get_property_value.argtypes = [ctypes.POINTER(GetPropertyReply)]
+        xcb.xcb_get_property_value.restype = vp
+        xcb.xcb_get_property_value_length.argtypes = [ctypes.POINTER(GetPropertyReply)]
+        xcb.xcb_get_property_value_length.restype = ctypes.c_int
+        libc.free.argtypes = [vp]
+        libc.free.restype = None
+        self._xcb = xcb
+        self._free = libc.free
+
+        screen_num = ctypes.c_int(0)
+        self._conn = xcb.xcb_connect(None, ctypes.byref(screen_num))
+        if not self._conn:
+            raise OSError("cannot connect to X server")
+        try:
+            # xcb_connect returns an error object on failure, which still must be disconnected
+            if xcb.xcb_connection_has_error(self._conn):
+                raise OSError("cannot connect to X server")
+            it = xcb.xcb_setup_roots_iterator(xcb.xcb_get_setup(self._conn))
+            for _ in range(screen_num.value):
+                xcb.xcb_screen_next(ctypes.byref(it))
+            self._root = it.data[0]
+            self._net_active_window = self._intern(b"_NET_ACTIVE_WINDOW")
+            self._net_wm_name = self._intern(b"_NET_WM_NAME")
+            self._utf8_string = self._intern(b"UTF8_STRING")
+        except Exception:
+            xcb.xcb_disconnect(self._conn)
+            raise
+
+    def _intern(self, name: bytes) -> int:
+        reply = self._xcb.xcb_intern_atom_reply(self._conn, self._xcb.xcb_intern_atom(self._conn, 0, len(name), name), None)
+        if not reply:
+            raise OSError(f"xcb_intern_atom failed for {name!r}")
+        try:
+            return reply.contents.atom
+        finally:
+            self._free(reply)
+
+    def _get_property(self, window: int, prop: int, type_: int, long_length: int) -> bytes:
+        cookie = self._xcb.xcb_get_property(self._conn, 0, window, prop, type_, 0, long_length)
+        reply = self._xcb.xcb_get_property_reply(self._conn, cookie, None)
+        if not reply:
+            return b""
+        try:
+            length = self._xcb.xcb_get_property_value_length(reply)
+            if length <= 0:
+                return b""
+            return self._ctypes.string_at(self._xcb.xcb_get_property_value(reply), length)
+        finally:
+            self._free(reply)
+
+    def active_window_title(self) -> Optional[str]:
+        """Title of the focused window, "" if it has none, or None if the connection is gone."""
+        if self._xcb.xcb_connection_has_error(self._conn):
+            return None
+        raw = self._get_property(self._root, self._net_active_window, self._ATOM_WINDOW, 1)
+        if len(raw) < 4:
+            return ""
+        window = int.from_bytes(raw[:4], sys.byteorder)
+        if not window:
+            return ""
+        title = self._get_property(window, self._net_wm_name, self._utf8_string, 1024)
+        if not title:
+            title = self._get_property(window, self._ATOM_WM_NAME, self._ATOM_STRING, 1024)
+        return title.decode("utf-8", errors="replace")
+
+
+_xcb_reader_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _open_xcb_title_reader() -> Optional[_XcbTitleReader]:
+    try:
+        return _XcbTitleReader()
+    except Exception:
+        return None
+
+
+def _xcb_title_reader() -> Optional[_XcbTitleReader]:
+    """Process-wide XCB reader, or None when libxcb or an X server is unavailable.
+    lru_cache doesn't serialize a first call, and concurrent saves look up titles from
+    executor threads, so the lock keeps them from opening (and leaking) a second connection.
+    """
+    with _xcb_reader_lock:
+        return _open_xcb_title_reader()
 
 
 def get_active_window_title() -> str:
     """Try to obtain the current active window title. Platform-specific; safe fallback."""
-    system = platform.system().lower()
     try:
-        if system == "windows":
+        if _IS_WINDOWS:
             import ctypes
             from ctypes import wintypes
 
@@ -178,7 +476,7 @@ def get_active_window_title() -> str:
             GetWindowTextW(hwnd, buff, length + 1)
             title = buff.value
             return title or "unknown"
-        elif system == "darwin":
+        elif _SYSTEM == "darwin":
             # macOS best-effort using AppKit
             try:
                 from AppKit import NSWorkspace  # type: ignore
@@ -188,7 +486,15 @@ def get_active_window_title() -> str:
             except Exception:
                 return "unknown"
         else:
-            # Linux best-effort using xprop if available
+            # Linux: query X11 directly through libxcb; fall back to xprop if that fails
+            reader = _xcb_title_reader()
+            if reader is not None:
+                try:
+                    title = reader.active_window_title()
+                    if title is not None:
+                        return title or "unknown"
+                except Exception:
+                    pass
             if shutil.which("xprop"):
                 try:
                     out = subprocess.check_output(
@@ -199,7 +505,7 @@ def get_active_window_title() -> str:
                     if out:
                         win_id = out
                         title = subprocess.check_output(
-                            ["bash", "-lc", f"xprop -id {win_id} _NET_WM_NAME | cut -d '" -f2"],
+                            ["bash", "-lc", f"xprop -id {win_id} _NET_WM_NAME | cut -d '\"' -f2"],
                             stderr=subprocess.DEVNULL,
                             text=True,
                         ).strip()
@@ -212,13 +518,9 @@ def get_active_window_title() -> str:
 
 
 def sanitize_filename_component(s: str) -> str:
-    s = s.strip()
-    if not s:
-        return "untitled"
-    s = re.sub(r"\s+", " ", s)
-    s = re.sub(r"[^\w\-\. ]+", "", s)
-    s = s.replace(" ", "_")
-    return s[:80]  # keep it reasonable
+    s = _WS_RE.sub(" ", s.strip())
+    s = _BAD_RE.sub("", s)
+    return s.replace(" ", "_")[:80] or "untitled"  # keep it reasonable
 
 
 @dataclass
@@ -231,94 +533,316 @@ class Config:
     framerate: int = DEFAULT_FRAMERATE
     encoder: str = "libx264"
     preset: str = "veryfast"
+    bitrate: str = DEFAULT_BITRATE  # used by hardware encoders (CBR)
     gop: int = 120  # ~2s GOP @60fps
+    use_ddagrab: bool = False  # Windows: Desktop Duplication capture instead of gdigrab
+    buffer_in_ram: bool = False  # buffer_dir is tmpfs; segments are deleted on exit
     min_free_gb: int = 2
 
 
+def video_codec_args(cfg: Config) -> List[str]:
+    """Encoder selection plus the rate-control/latency flags each encoder family understands."""
+    enc = cfg.encoder
+    # Hardware encoders emit plain I-frames at forced keyframes unless told otherwise; the
+    # forced-IDR options keep every segment independently decodable
+    if enc.endswith("_nvenc"):
+        return ["-c:v", enc, "-preset", cfg.preset, "-tune", "ll", "-rc", "cbr", "-b:v", cfg.bitrate, "-forced-idr", "1"]
+    if enc.endswith("_qsv"):
+        return ["-c:v", enc, "-preset", cfg.preset, "-b:v", cfg.bitrate, "-forced_idr", "1"]
+    if enc.endswith("_amf"):
+        return ["-c:v", enc, "-usage", "lowlatency", "-quality", "speed", "-b:v", cfg.bitrate, "-forced_idr", "1"]
+    if enc.endswith("_videotoolbox"):
+        return ["-c:v", enc, "-realtime", "1", "-b:v", cfg.bitrate]
+    return ["-c:v", enc, "-preset", cfg.preset, "-tune", "zerolatency"]
+
+
+class SegmentIndex:
+    """In-memory view of the ring buffer segments, oldest first.
+
+    FFmpeg names segments ``buf-%05d.ts`` with a monotonically increasing counter, so
+    insertion order is chronological order and no sorting or directory scans are needed.
+    A single watcher thread probes for the next expected filename every ``poll_interval``
+    seconds and appends it; readers that need the very latest segment call ``poll`` first.
+    Hotkey handlers and the status line read the deque without touching the filesystem,
+    and can block on ``wait_for_change`` instead of polling. Paths are kept as plain strings so
+    deletion and concat never round-trip through pathlib.
+    """
+
+    def __init__(
+        self,
+        buffer_dir: Path,
+        poll_interval: float = 0.5,
+        on_append: Optional[Callable[[int], None]] = None,
+    ):
+        self.buffer_dir = buffer_dir
+        self.poll_interval = poll_interval
+        self.on_append = on_append  # called from the watcher thread with each new segment number
+        self._dir = os.fspath(buffer_dir)
+        self._entries: Deque[Tuple[int, str]] = collections.deque()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._poll_lock = threading.Lock()  # poll runs on the watcher and on clip saves
+        self._stop = threading.Event()
+        self._next = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.purge()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait_for_change(self, timeout: Optional[float] = None) -> bool:
+        """Block until segments are added or removed; False if the timeout elapsed first."""
+        with self._changed:
+            return self._changed.wait(timeout)
+
+    def purge(self) -> None:
+        """Empty the index and delete every segment file in the buffer directory.
+        Run at startup because FFmpeg restarts numbering at 0 and would overwrite leftovers
+        from a previous session out of order, and at shutdown when the buffer is RAM-backed
+        so it doesn't keep holding memory.
+        """
+        with self._poll_lock, self._changed:
+            self._entries.clear()
+            self._next = 0
+            self._changed.notify_all()
+        try:
+            with os.scandir(self._dir) as it:
+                for entry in it:
+                    if _SEGMENT_RE.fullmatch(entry.name):
+                        try:
+                            os.unlink(entry.path)
+                        except OSError:
+                            pass
+        except FileNotFoundError:
+            pass
+
+    def _watch_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                pass
+            self._stop.wait(self.poll_interval)
+
+    def poll(self) -> int:
+        """Append any newly created segments; returns how many were added."""
+        added = 0
+        with self._poll_lock:
+            while True:
+                path = os.path.join(self._dir, f"buf-{self._next:05d}.ts")
+                if not os.path.exists(path):
+                    return added
+                number = self._next
+                with self._changed:
+                    self._entries.append((number, path))
+                    self._changed.notify_all()
+                self._next += 1
+                added += 1
+                if self.on_append:
+                    self.on_append(number)
+
+    def snapshot_last(self, n: int) -> List[str]:
+        """Return up to ``n`` most recent segments in chronological order.
+        Walks only the ``n`` newest entries rather than copying the whole buffer.
+        """
+        with self._lock:
+            newest_first = [p for _, p in itertools.islice(reversed(self._entries), max(0, n))]
+        newest_first.reverse()
+        return newest_first
+
+    def newest_number(self) -> Optional[int]:
+        """Segment counter of the most recent segment, or None if the buffer is empty."""
+        with self._lock:
+            return self._entries[-1][0] if self._entries else None
+
+    def pop_oldest(self, n: int) -> List[str]:
+        """Remove up to ``n`` oldest segments from the index and return them."""
+        with self._changed:
+            popped = [self._entries.popleft()[1] for _ in range(min(n, len(self._entries)))]
+            if popped:
+                self._changed.notify_all()
+            return popped
+
+    def pop_through(self, number: int) -> List[str]:
+        """Remove every segment numbered ``number`` or lower and return them."""
+        popped: List[str] = []
+        with self._changed:
+            while self._entries and self._entries[0][0] <= number:
+                popped.append(self._entries.popleft()[1])
+            if popped:
+                self._changed.notify_all()
+        return popped
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def buffer_capacity(clip_length: int, segment_time: int) -> int:
+    """Number of segments kept in the ring buffer."""
+    return int(clip_length / segment_time) * 3  # generous cushion
+
+
+def _tmpfs_buffer_candidates() -> List[Path]:
+    """RAM-backed buffer locations on Linux, most private first."""
+    candidates = []
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        candidates.append(Path(runtime_dir) / "clipper")  # per-user 0700 tmpfs
+    candidates.append(SHM_DIR / f"clipper-{os.getuid()}")
+    return candidates
+
+
+def _private_dir(path: Path) -> bool:
+    """Create `path` as a 0700 directory and check it is safe to hold the recording.
+    /dev/shm is writable by every local user, so the name may already exist as someone
+    else's directory or a symlink; only a real directory we own with no group/other
+    access is accepted.
+    """
+    try:
+        path.mkdir(mode=0o700, exist_ok=True)
+        st = path.lstat()
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def pick_buffer_dir(clip_length: int, segment_time: int) -> Path:
+    """Choose where the ring buffer lives.
+    On Linux, a tmpfs ($XDG_RUNTIME_DIR, else /dev/shm) is preferred when it has room for a
+    full buffer at BUFFER_BYTES_PER_SEC: segments are mostly discarded, so keeping them in
+    RAM avoids continuous SSD writes and makes concat reads fast. Windows and macOS have no
+    standard RAM disk, so they use BUFFER_DIR next to the app.
+    """
+    if _SYSTEM == "linux":
+        needed = buffer_capacity(clip_length, segment_time) * segment_time * BUFFER_BYTES_PER_SEC
+        for candidate in _tmpfs_buffer_candidates():
+            parent = candidate.parent
+            try:
+                if (
+                    parent.is_dir()
+                    and os.access(parent, os.W_OK)
+                    and _free_bytes(parent) > needed
+                    and _private_dir(candidate)
+                ):
+                    return candidate
+            except OSError:
+                pass
+    return BUFFER_DIR
+
+
+def _unlink_all(paths: List[str]) -> None:
+    """Delete segment files, ignoring ones already gone or still locked by FFmpeg."""
+    for path in paths:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
 class Recorder:
     def __init__(self, cfg: Config, region: MonitorRegion):
         self.cfg = cfg
         self.region = region
+        self.capacity = buffer_capacity(cfg.clip_length, cfg.segment_time)
+        # A new segment appears every segment_time seconds, so there is no point probing
+        # more often; clip saves poll on demand to pick up the in-progress segment.
+        self.index = SegmentIndex(cfg.buffer_dir, poll_interval=cfg.segment_time, on_append=self._on_segment)
         self.proc: Optional[subprocess.Popen] = None
-        self.stop_event = threading.Event()
-        self.cleanup_thread: Optional[threading.Thread] = None
 
     def start(self) -> None:
         self.cfg.buffer_dir.mkdir(parents=True, exist_ok=True)
+        self.index.start()
         cmd = self._build_ffmpeg_record_cmd()
         logging.debug("Recording command: %s", " ".join(cmd))
         self.proc = subprocess.Popen(
             cmd,
+            # Windows: stdin carries FFmpeg's 'q' quit command (see stop); POSIX stops via SIGINT
+            stdin=(subprocess.PIPE if _IS_WINDOWS else subprocess.DEVNULL),
             stdout=subprocess.DEVNULL,
             stderr=subprocess.STDOUT,
-            creationflags=(subprocess.CREATE_NO_WINDOW if platform.system().lower() == "windows" else 0),  # type: ignore[attr-defined]
+            creationflags=_CREATIONFLAGS,
         )
-        self.cleanup_thread = threading.Thread(target=self._cleanup_loop, daemon=True)
-        self.cleanup_thread.start()
         logging.info("Recording started into %s", self.cfg.buffer_dir)
 
     def stop(self) -> None:
-        self.stop_event.set()
+        self.index.stop()
         if self.proc and self.proc.poll() is None:
             logging.info("Stopping FFmpeg recorder...")
             try:
-                self.proc.terminate()
+                # Let FFmpeg finish the in-progress segment; hard-stop only if it doesn't exit
+                self._request_graceful_stop(self.proc)
                 try:
                     self.proc.wait(timeout=5)
                 except subprocess.TimeoutExpired:
-                    self.proc.kill()
+                    self.proc.terminate()
+                    try:
+                        self.proc.wait(timeout=2)
+                    except subprocess.TimeoutExpired:
+                        self.proc.kill()
             except Exception:
                 pass
         self.proc = None
-
-    def _cleanup_loop(self) -> None:
-        """Maintain a soft circular buffer by deleting older segments beyond capacity or on low disk space."""
-        capacity = int(self.cfg.clip_length / self.cfg.segment_time) * 3  # generous cushion
-        while not self.stop_event.is_set():
+        if self.cfg.buffer_in_ram:
+            # free the RAM; an on-disk buffer keeps the segment FFmpeg just finalized
+            self.index.purge()
+
+    def _request_graceful_stop(self, proc: subprocess.Popen) -> None:
+        if _IS_WINDOWS:
+            # CTRL_BREAK_EVENT only reaches processes attached to our console, which a
+            # CREATE_NO_WINDOW child (or a --noconsole build) is not; 'q' on stdin always works.
             try:
-                segs = sorted(self.cfg.buffer_dir.glob("buf-*.ts"), key=lambda p: p.stat().st_mtime)
-                if len(segs) > capacity:
-                    to_delete = segs[0 : len(segs) - capacity]
-                    for p in to_delete:
-                        try:
-                            p.unlink(missing_ok=True)
-                        except Exception:
-                            pass
-                if psutil:
-                    try:
-                        usage = psutil.disk_usage(str(self.cfg.clips_dir))
-                        free_gb = usage.free / (1024 ** 3)
-                        if free_gb < self.cfg.min_free_gb and segs:
-                            # free some space by deleting 10% oldest buffer
-                            count = max(1, len(segs) // 10)
-                            for p in segs[:count]:
-                                p.unlink(missing_ok=True)
-                            logging.warning("Low disk space (%.2f GB). Pruned %d old segments.", free_gb, count)
-                    except Exception:
-                        pass
-            except Exception:
+                if proc.stdin:
+                    proc.stdin.write(b"q")
+                    proc.stdin.close()
+            except OSError:
                 pass
-            self.stop_event.wait(5)
+        else:
+            proc.send_signal(signal.SIGINT)  # FFmpeg flushes and closes the segment on SIGINT
+
+    def _on_segment(self, number: int) -> None:
+        """Maintain a soft circular buffer as each new segment appears: delete segments beyond
+        capacity, then, while the buffer's own volume is low on space (it may be on tmpfs,
+        apart from clips), keep deleting the oldest 10% until it recovers. Runs on the index
+        watcher thread, so nothing wakes up on a timer to do cleanup.
+        """
+        try:
+            # keep the newest `capacity` segment numbers; everything at or below the cutoff goes
+            _unlink_all(self.index.pop_through(number - self.capacity))
+            pruned = 0
+            free_gb = _free_bytes(self.cfg.buffer_dir) / (1024 ** 3)
+            # always keep the newest segment, which FFmpeg is still writing
+            while free_gb < self.cfg.min_free_gb and len(self.index) > 1:
+                count = min(max(1, len(self.index) // 10), len(self.index) - 1)
+                _unlink_all(self.index.pop_oldest(count))
+                pruned += count
+                free_gb = _free_bytes(self.cfg.buffer_dir) / (1024 ** 3)
+            if pruned:
+                logging.warning("Low buffer space (%.2f GB free). Pruned %d old segments.", free_gb, pruned)
+        except Exception:
+            pass
 
     def _build_ffmpeg_record_cmd(self) -> List[str]:
-        system = platform.system().lower()
         out_pattern = str(self.cfg.buffer_dir / "buf-%05d.ts")
+        # Force a keyframe at every segment boundary; with the forced-IDR encoder options
+        # (see video_codec_args) each segment starts on an IDR and stream-copy concat works.
         common_video = [
-            "-c:v",
-            self.cfg.encoder,
-            "-preset",
-            self.cfg.preset,
-            "-tune",
-            "zerolatency",
-            "-pix_fmt",
-            "yuv420p",
+            *video_codec_args(self.cfg),
+            "-force_key_frames",
+            f"expr:gte(t,n_forced*{self.cfg.segment_time})",
             "-g",
             str(self.cfg.gop),
-            "-keyint_min",
-            str(self.cfg.gop),
             "-sc_threshold",
             "0",
         ]
+        pix_fmt = ["-pix_fmt", "yuv420p"]
         segmenter = [
             "-f",
             "segment",
@@ -331,7 +855,20 @@ class Recorder:
             out_pattern,
         ]
 
-        if system == "windows":
+        if _IS_WINDOWS and self.cfg.use_ddagrab:
+            # Desktop Duplication API: frames stay on the GPU as D3D11 surfaces. NVENC/AMF
+            # encode them directly; other encoders need them downloaded to system memory.
+            input_sec = [
+                "-f",
+                "lavfi",
+                "-i",
+                f"ddagrab=output_idx=0:framerate={self.cfg.framerate}:draw_mouse=1",
+            ]
+            if self.cfg.encoder.endswith(D3D11_ENCODER_SUFFIXES):
+                return [self.cfg.ffmpeg_path, *input_sec, *common_video, *segmenter]
+            download = ["-vf", "hwdownload,format=bgra"]
+            return [self.cfg.ffmpeg_path, *input_sec, *download, *common_video, *pix_fmt, *segmenter]
+        elif _IS_WINDOWS:
             # Use gdigrab with explicit region for primary monitor, preserving cursor
             r = self.region
             input_sec = [
@@ -350,8 +887,8 @@ class Recorder:
                 "-i",
                 "desktop",
             ]
-            return [self.cfg.ffmpeg_path, *input_sec, *common_video, *segmenter]
-        elif system == "darwin":
+            return [self.cfg.ffmpeg_path, *input_sec, *common_video, *pix_fmt, *segmenter]
+        elif _SYSTEM == "darwin":
             # Best-effort macOS (primary display). avfoundation device index for screen capture can vary.
             r = self.region
             input_sec = [
@@ -366,7 +903,7 @@ class Recorder:
                 "-i",
                 "1:none",  # may need adjustment per machine; see README
             ]
-            return [self.cfg.ffmpeg_path, *input_sec, *common_video, *segmenter]
+            return [self.cfg.ffmpeg_path, *input_sec, *common_video, *pix_fmt, *segmenter]
         else:
             # Linux X11
             r = self.region
@@ -381,128 +918,216 @@ class Recorder:
                 "-i",
                 f"{display}+{r.offset_x},{r.offset_y}",
             ]
-            return [self.cfg.ffmpeg_path, *input_sec, *common_video, *segmenter]
+            return [self.cfg.ffmpeg_path, *input_sec, *common_video, *pix_fmt, *segmenter]
+
+
+def _concat_entry(path: str) -> str:
+    """One concat-demuxer line for a segment.
+    The list is read from pipe:0 and entries resolve against the list's own URL, so a bare
+    path would become ``pipe:<path>``; an absolute ``file:`` URL always names the file.
+    """
+    url = "file:" + os.path.abspath(path).replace(os.sep, "/")
+    return "file '" + url.replace("'", "'\\''") + "'\n"
 
 
 class ClipAssembler:
-    def __init__(self, cfg: Config):
+    """Assembles clips on a dedicated asyncio event loop thread.
+    Hotkey handlers call ``submit``; up to ``max_concurrent`` concat jobs run at once, so
+    repeated presses neither spawn a thread each nor queue up behind a single lock.
+    """
+
+    def __init__(self, cfg: Config, index: SegmentIndex, max_concurrent: int = 2):
         self.cfg = cfg
-        self.lock = threading.Lock()
+        self.index = index
+        self.max_concurrent = max_concurrent
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._tasks: Set[asyncio.Future] = set()
+        self._reserved: Set[Path] = set()  # output paths of in-flight saves
 
-    def save_clip(self, length_seconds: Optional[int] = None) -> Optional[Path]:
+    def start(self) -> None:
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the loop, giving in-flight saves up to ``timeout`` seconds to finish.
+        Saves still running after that are cancelled and their FFmpeg killed, since the
+        recorder is about to delete the segments they read.
+        """
+        loop = self._loop
+        if loop is None:
+            return
+        drain = asyncio.run_coroutine_threadsafe(self._drain(), loop)
+        try:
+            drain.result(timeout)
+        except Exception:
+            drain.cancel()
+            try:
+                asyncio.run_coroutine_threadsafe(self._cancel_pending(), loop).result(5)
+            except Exception:
+                pass
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread:
+            self._thread.join(timeout=2)
+        self._loop = None
+
+    def submit(self, length_seconds: Optional[int] = None) -> None:
+        """Queue a clip save; safe to call from any thread."""
+        loop, queue = self._loop, self._queue
+        if loop is None or queue is None:
+            logging.error("Clip assembler is not running; ignoring save request.")
+            return
+        loop.call_soon_threadsafe(queue.put_nowait, length_seconds)
+
+    def _run_loop(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        worker = loop.create_task(self._save_worker(self._queue))
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            worker.cancel()
+            loop.run_until_complete(asyncio.gather(worker, *self._tasks, return_exceptions=True))
+            loop.close()
+
+    async def _save_worker(self, queue: asyncio.Queue) -> None:
+        sem = asyncio.Semaphore(self.max_concurrent)
+        while True:
+            length = await queue.get()
+            task = asyncio.ensure_future(self._save_limited(sem, length))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _save_limited(self, sem: asyncio.Semaphore, length: Optional[int]) -> None:
+        async with sem:
+            try:
+                await self.save_clip(length)
+            except Exception as e:  # pragma: no cover - defensive
+                logging.exception("Clip save failed: %s", e)
+
+    async def _drain(self) -> None:
+        await asyncio.sleep(0)  # let the worker pick up anything still queued
+        if self._tasks:
+            await asyncio.wait(set(self._tasks))
+
+    async def _cancel_pending(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def save_clip(self, length_seconds: Optional[int] = None) -> Optional[Path]:
         length = length_seconds or self.cfg.clip_length
         needed_segments = max(1, int((length + self.cfg.segment_time - 1) / self.cfg.segment_time))
 
-        with self.lock:  # prevent concurrent assemblies
-            # Check disk space
-            if psutil:
-                try:
-                    usage = psutil.disk_usage(str(self.cfg.clips_dir))
-                    if usage.free < 300 * 1024 * 1024:  # 300MB
-                        logging.error("Insufficient free space to save clip.")
-                        return None
-                except Exception:
-                    pass
-
-            segs = sorted(self.cfg.buffer_dir.glob("buf-*.ts"), key=lambda p: p.stat().st_mtime, reverse=True)
-            if not segs:
-                logging.error("No segments found; recording may not have started yet.")
+        # Check disk space
+        try:
+            if _free_bytes(self.cfg.clips_dir) < 300 * 1024 * 1024:  # 300MB
+                logging.error("Insufficient free space to save clip.")
                 return None
-            chosen = list(reversed(segs[:needed_segments]))  # chronological order
-
-            # Prepare output path
-            now = dt.datetime.now()
-            ts = now.strftime("%Y%m%d_%H%M%S")
-            active_title = sanitize_filename_component(get_active_window_title())
-            duration_lab = f"{length}s"
-            filename = f"{ts}_{duration_lab}_{active_title}.mp4"
-            self.cfg.clips_dir.mkdir(parents=True, exist_ok=True)
-            out_path = self.cfg.clips_dir / filename
-
-            # Create concat list file
-            with tempfile.NamedTemporaryFile("w", delete=False, suffix=".txt", dir=str(self.cfg.buffer_dir)) as tf:
-                for p in chosen:
-                    tf.write(f"file '{p.as_posix()}'\n")
-                list_path = Path(tf.name)
-
-            # First attempt: stream copy (fast)
-            copy_cmd = [
-                self.cfg.ffmpeg_path,
-                "-y",
-                "-f",
-                "concat",
-                "-safe",
-                "0",
-                "-i",
-                str(list_path),
-                "-c",
-                "copy",
-                "-movflags",
-                "+faststart",
-                str(out_path),
-            ]
-            logging.info("Assembling clip (%ds) -> %s", length, out_path.name)
-            logging.debug("Concat (copy) command: %s", " ".join(copy_cmd))
+        except Exception:
+            pass
+
+        self.index.poll()  # the watcher may not have seen the newest segment yet
+        chosen = self.index.snapshot_last(needed_segments)  # chronological order
+        if not chosen:
+            logging.error("No segments found; recording may not have started yet.")
+            return None
+
+        # Prepare output path (the xprop title fallback forks, so keep it off the loop)
+        now = dt.datetime.now()
+        ts = now.strftime("%Y%m%d_%H%M%S")
+        title = await asyncio.get_running_loop().run_in_executor(None, get_active_window_title)
+        active_title = sanitize_filename_component(title)
+        duration_lab = f"{length}s"
+        self.cfg.clips_dir.mkdir(parents=True, exist_ok=True)
+        out_path = self._reserve_out_path(f"{ts}_{duration_lab}_{active_title}")
+
+        # Concat list is fed to FFmpeg on stdin; no temp file in the critical path
+        list_data = "".join(_concat_entry(p) for p in chosen).encode("utf-8")
+
+        # Segments start on forced keyframes (see Recorder), so stream copy is always valid
+        copy_cmd = [
+            self.cfg.ffmpeg_path,
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-protocol_whitelist",
+            "pipe,file",
+            "-i",
+            "pipe:0",
+            "-c",
+            "copy",
+            "-movflags",
+            "+faststart",
+            str(out_path),
+        ]
+        logging.info("Assembling clip (%ds) -> %s", length, out_path.name)
+        logging.debug("Concat command: %s", " ".join(copy_cmd))
+        try:
+            await self._run_concat(copy_cmd, list_data)
+        except subprocess.CalledProcessError as e:
+            logging.exception("Failed to assemble clip: %s", e)
+            return None
+        except asyncio.CancelledError:
+            logging.warning("Clip save cancelled at shutdown: %s", out_path.name)
             try:
-                subprocess.check_call(
-                    copy_cmd,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.STDOUT,
-                    creationflags=(subprocess.CREATE_NO_WINDOW if platform.system().lower() == "windows" else 0),  # type: ignore[attr-defined]
-                )
-                logging.info("Clip saved: %s", out_path)
-                notify(f"Clip saved: {out_path}")
-                return out_path
-            except subprocess.CalledProcessError:
-                logging.warning("Fast concat failed; retrying with re-encode...")
-                # Fallback: re-encode to ensure a clean MP4
-                reenc_cmd = [
-                    self.cfg.ffmpeg_path,
-                    "-y",
-                    "-f",
-                    "concat",
-                    "-safe",
-                    "0",
-                    "-i",
-                    str(list_path),
-                    "-c:v",
-                    self.cfg.encoder,
-                    "-preset",
-                    self.cfg.preset,
-                    "-pix_fmt",
-                    "yuv420p",
-                    str(out_path),
-                ]
-                logging.debug("Concat (reencode) command: %s", " ".join(reenc_cmd))
-                try:
-                    subprocess.check_call(
-                        reenc_cmd,
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.STDOUT,
-                        creationflags=(subprocess.CREATE_NO_WINDOW if platform.system().lower() == "windows" else 0),  # type: ignore[attr-defined]
-                    )
-                    logging.info("Clip saved (re-encoded): %s", out_path)
-                    notify(f"Clip saved: {out_path}")
-                    return out_path
-                except subprocess.CalledProcessError as e:
-                    logging.exception("Failed to assemble clip: %s", e)
-                    return None
-                finally:
-                    try:
-                        list_path.unlink(missing_ok=True)
-                    except Exception:
-                        pass
-            finally:
-                try:
-                    list_path.unlink(missing_ok=True)
-                except Exception:
-                    pass
+                out_path.unlink()  # partial MP4 without its index is unplayable
+            except OSError:
+                pass
+            raise
+        finally:
+            self._reserved.discard(out_path)
+        logging.info("Clip saved: %s", out_path)
+        notify(f"Clip saved: {out_path}")
+        return out_path
+
+    def _reserve_out_path(self, stem: str) -> Path:
+        """Pick an unused clip filename; concurrent saves in the same second share a timestamp."""
+        out_path = self.cfg.clips_dir / f"{stem}.mp4"
+        n = 2
+        while out_path in self._reserved or out_path.exists():
+            out_path = self.cfg.clips_dir / f"{stem}_{n}.mp4"
+            n += 1
+        self._reserved.add(out_path)
+        return out_path
+
+    async def _run_concat(self, cmd: List[str], list_data: bytes) -> None:
+        """Run an FFmpeg concat command that reads its file list from stdin.
+        Raises CalledProcessError on a non-zero exit, like subprocess.check_call.
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.STDOUT,
+            creationflags=_CREATIONFLAGS,
+        )
+        try:
+            await proc.communicate(list_data)
+        except asyncio.CancelledError:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+            await proc.wait()
+            raise
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
 
 
 def notify(message: str) -> None:
     """Best-effort user notification. On Windows, tries win10toast if present, else prints."""
     try:
-        if platform.system().lower() == "windows":
+        if _IS_WINDOWS:
             try:
                 from win10toast import ToastNotifier  # type: ignore
 
@@ -566,27 +1191,31 @@ class Hotkeys:
                 pass
 
     def _save(self, length: int) -> None:
-        threading.Thread(target=self.assembler.save_clip, args=(length,), daemon=True).start()
+        self.assembler.submit(length)
 
 
-def status_loop(cfg: Config, stop_event: threading.Event) -> None:
+def status_loop(cfg: Config, index: SegmentIndex, stop_event: threading.Event) -> None:
+    """Render the status line when the segment count or free space changes.
+    Wakes on segment index changes, plus every 2s to refresh free disk space.
+    """
+    last_state: Optional[Tuple[int, int]] = None
     while not stop_event.is_set():
         try:
-            seg_count = len(list(cfg.buffer_dir.glob("buf-*.ts")))
+            seg_count = len(index)
             free_gb = 0.0
-            if psutil:
-                try:
-                    usage = psutil.disk_usage(str(cfg.clips_dir))
-                    free_gb = usage.free / (1024 ** 3)
-                except Exception:
-                    pass
-            sys.stdout.write(
-                f"\rRecording — buffer {cfg.clip_length}s | segments ~{seg_count} | free {free_gb:.2f} GB     "
-            )
-            sys.stdout.flush()
+            try:
+                free_gb = _free_bytes(cfg.clips_dir) / (1024 ** 3)
+            except Exception:
+                pass
+            state = (seg_count, int(free_gb * 100))
+            if state != last_state:
+                last_state = state
+                line = f"Recording — buffer {cfg.clip_length}s | segments ~{seg_count} | free {free_gb:.2f} GB     "
+                sys.stdout.write("\r" + line)
+                sys.stdout.flush()
         except Exception:
             pass
-        stop_event.wait(2)
+        index.wait_for_change(timeout=2)
     print()
 
 
@@ -595,8 +1224,20 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--clip-length", type=int, default=DEFAULT_BUFFER_SECS, help="Clip length in seconds to save on hotkey")
     p.add_argument("--segment-time", type=int, default=DEFAULT_SEGMENT_SECS, help="Segment duration in seconds for the ring buffer")
     p.add_argument("--framerate", type=int, default=DEFAULT_FRAMERATE, help="Capture framerate")
-    p.add_argument("--encoder", type=str, default="libx264", help="Video encoder (e.g., libx264, h264_nvenc)")
-    p.add_argument("--preset", type=str, default="veryfast", help="Encoder preset (e.g., veryfast, fast)")
+    p.add_argument(
+        "--encoder",
+        type=str,
+        default="auto",
+        help="Video encoder (e.g., libx264, h264_nvenc); 'auto' prefers a hardware encoder, else libx264",
+    )
+    p.add_argument("--preset", type=str, default=None, help="Encoder preset (default: veryfast for libx264, p4 for NVENC)")
+    p.add_argument("--bitrate", type=str, default=DEFAULT_BITRATE, help="Target bitrate for hardware encoders")
+    p.add_argument(
+        "--buffer-dir",
+        type=Path,
+        default=None,
+        help="Directory for ring buffer segments (default: a private tmpfs directory on Linux when it has room, else ./buffer)",
+    )
     p.add_argument("--verbose", action="store_true", help="Verbose logging")
     return p.parse_args()
 
@@ -614,23 +1255,40 @@ def main() -> int:
     region = detect_primary_monitor()
     logging.info("Primary monitor: %dx%d at (%d,%d)", region.width, region.height, region.offset_x, region.offset_y)
 
+    encoder = args.encoder
+    if encoder == "auto":
+        encoder = detect_hw_encoder(ffmpeg)
+    logging.info("Video encoder: %s", encoder)
+
+    if args.buffer_dir:
+        # Resolve now so segment paths don't depend on the working directory
+        buffer_dir = args.buffer_dir.resolve()
+    else:
+        buffer_dir = pick_buffer_dir(args.clip_length, args.segment_time)
+
     cfg = Config(
         ffmpeg_path=ffmpeg,
-        buffer_dir=BUFFER_DIR,
+        buffer_dir=buffer_dir,
         clips_dir=CLIPS_DIR,
         clip_length=args.clip_length,
         segment_time=args.segment_time,
         framerate=args.framerate,
-        encoder=args.encoder,
-        preset=args.preset,
+        encoder=encoder,
+        preset=args.preset or DEFAULT_PRESETS.get(encoder, "veryfast"),
+        bitrate=args.bitrate,
         gop=max(30, int(args.framerate * 2)),  # ~2s GOP for smooth concatenation
+        use_ddagrab=_IS_WINDOWS and ffmpeg_has_filter(ffmpeg, "ddagrab"),
+        buffer_in_ram=not args.buffer_dir and buffer_dir != BUFFER_DIR,
     )
+    if cfg.use_ddagrab:
+        logging.info("Screen capture: ddagrab (Desktop Duplication)")
+    logging.info("Ring buffer directory: %s", cfg.buffer_dir)
 
     # Ensure clips/ exists on first launch (even before first save)
     cfg.clips_dir.mkdir(parents=True, exist_ok=True)
 
     recorder = Recorder(cfg, region)
-    assembler = ClipAssembler(cfg)
+    assembler = ClipAssembler(cfg, recorder.index)
     hotkeys = Hotkeys(assembler, default_length=cfg.clip_length)
 
     stop_event = threading.Event()
@@ -647,14 +1305,18 @@ def main() -> int:
 
     try:
         recorder.start()
+        assembler.start()
         hotkeys.start()
-        status_thr = threading.Thread(target=status_loop, args=(cfg, stop_event), daemon=True)
+        status_thr = threading.Thread(target=status_loop, args=(cfg, recorder.index, stop_event), daemon=True)
         status_thr.start()
-        # Wait
-        while not stop_event.is_set():
-            time.sleep(0.5)
+        # Block until a signal handler sets stop_event. Windows can't interrupt an untimed
+        # wait with Ctrl+C, so wake there once a second to let the handler run.
+        wake = 1.0 if _IS_WINDOWS else None
+        while not stop_event.wait(wake):
+            pass
     finally:
         hotkeys.stop()
+        assembler.stop()
         recorder.stop()
         logging.info("Goodbye.")
 
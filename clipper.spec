@@ -19,7 +19,7 @@ a = Analysis(
     pathex=['.'],
     binaries=binaries,
     datas=[],
-    hiddenimports=['screeninfo', 'psutil', 'keyboard', 'pynput'],
+    hiddenimports=['screeninfo', 'keyboard', 'pynput'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
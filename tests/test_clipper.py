@@ -1,9 +1,12 @@
+import asyncio
 import os
 import shutil
 import sys
+import threading
 from pathlib import Path
 
 import importlib
+import importlib.util
 import types
 import pytest
 
@@ -23,6 +26,11 @@ def test_sanitize_filename_component_basic():
     assert ":" not in out
 
 
+def test_sanitize_filename_component_empty_result():
+    assert clipper.sanitize_filename_component("   ") == "untitled"
+    assert clipper.sanitize_filename_component("<>:?*") == "untitled"
+
+
 def test_ffmpeg_detection_mocked(tmp_path, monkeypatch):
     # Simulate presence of ffmpeg in PATH by crafting a dummy executable
     fake_bin = tmp_path / ("ffmpeg" + (".exe" if os.name == "nt" else ""))
@@ -35,10 +43,556 @@ def test_ffmpeg_detection_mocked(tmp_path, monkeypatch):
     assert clipper.which_ffmpeg()
 
 
-@pytest.mark.skipif(clipper.get_monitors is None, reason="screeninfo not installed in test env")
+@pytest.mark.skipif(importlib.util.find_spec("screeninfo") is None, reason="screeninfo not installed in test env")
 def test_detect_primary_monitor_has_fields():
     r = clipper.detect_primary_monitor()
     assert isinstance(r.width, int)
     assert isinstance(r.height, int)
     assert isinstance(r.offset_x, int)
     assert isinstance(r.offset_y, int)
+
+
+def test_detect_primary_monitor_fallback_is_cached(monkeypatch):
+    monkeypatch.setitem(sys.modules, "screeninfo", None)  # makes the lazy import fail
+    clipper.detect_primary_monitor.cache_clear()
+    try:
+        assert clipper.detect_primary_monitor() == clipper.MonitorRegion(1920, 1080, 0, 0)
+        assert clipper.detect_primary_monitor.cache_info().hits == 0
+        clipper.detect_primary_monitor()
+        assert clipper.detect_primary_monitor.cache_info().hits == 1
+    finally:
+        clipper.detect_primary_monitor.cache_clear()
+
+
+class _FakeTitleReader:
+    def __init__(self, result):
+        self.result = result
+
+    def active_window_title(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.mark.parametrize(
+    "reader, expected",
+    [
+        (_FakeTitleReader("Game"), "Game"),
+        (_FakeTitleReader(""), "unknown"),  # focused window has no title
+        (_FakeTitleReader(None), "unknown"),  # connection lost: falls through to xprop
+        (_FakeTitleReader(OSError("X went away")), "unknown"),
+        (None, "unknown"),  # no libxcb / X server
+    ],
+)
+def test_linux_window_title_falls_back(monkeypatch, reader, expected):
+    monkeypatch.setattr(clipper, "_IS_WINDOWS", False)
+    monkeypatch.setattr(clipper, "_SYSTEM", "linux")
+    monkeypatch.setattr(clipper, "_xcb_title_reader", lambda: reader)
+    monkeypatch.setattr(clipper.shutil, "which", lambda name: None)  # no xprop either
+    assert clipper.get_active_window_title() == expected
+
+
+def test_xcb_title_reader_opened_once_across_threads(monkeypatch):
+    opened = []
+
+    def slow_reader():
+        opened.append(threading.get_ident())
+        threading.Event().wait(0.05)
+        return _FakeTitleReader("Game")
+
+    monkeypatch.setattr(clipper, "_XcbTitleReader", slow_reader)
+    clipper._open_xcb_title_reader.cache_clear()
+    try:
+        threads = [threading.Thread(target=clipper._xcb_title_reader) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(opened) == 1
+    finally:
+        clipper._open_xcb_title_reader.cache_clear()
+
+
+def test_segment_index_tracks_new_segments(tmp_path):
+    (tmp_path / "buf-00007.ts").write_bytes(b"stale")
+    index = clipper.SegmentIndex(tmp_path)
+    index.purge()
+    assert not (tmp_path / "buf-00007.ts").exists()
+    assert len(index) == 0
+
+    for i in range(4):
+        (tmp_path / f"buf-{i:05d}.ts").write_bytes(b"x")
+    assert index.poll() == 4
+    assert index.poll() == 0
+    assert index.snapshot_last(2) == [str(tmp_path / "buf-00002.ts"), str(tmp_path / "buf-00003.ts")]
+    assert index.snapshot_last(10)[0] == str(tmp_path / "buf-00000.ts")
+
+    assert index.pop_oldest(1) == [str(tmp_path / "buf-00000.ts")]
+    assert len(index) == 3
+
+
+def test_segment_index_pop_through_cutoff(tmp_path):
+    index = clipper.SegmentIndex(tmp_path)
+    for i in range(6):
+        (tmp_path / f"buf-{i:05d}.ts").write_bytes(b"x")
+    index.poll()
+    assert index.newest_number() == 5
+    capacity = 4
+    popped = index.pop_through(index.newest_number() - capacity)
+    assert popped == [str(tmp_path / "buf-00000.ts"), str(tmp_path / "buf-00001.ts")]
+    assert len(index) == capacity
+    assert index.pop_through(-1) == []
+
+
+def test_detect_hw_encoder_skips_unusable(monkeypatch):
+    listing = (
+        " V..... = Video\n"
+        " ------\n"
+        " V....D libx264              libx264 H.264 / AVC (codec h264)\n"
+        " V....D h264_nvenc           NVIDIA NVENC H.264 encoder (codec h264)\n"
+        " V....D h264_qsv             H.264 / AVC (Intel Quick Sync Video acceleration) (codec h264)\n"
+    )
+
+    def fake_run(cmd, **kwargs):
+        if "-encoders" in cmd:
+            return types.SimpleNamespace(stdout=listing, returncode=0)
+        # Pretend the NVIDIA driver is missing and Quick Sync works
+        return types.SimpleNamespace(stdout="", returncode=0 if "h264_qsv" in cmd else 1)
+
+    monkeypatch.setattr(clipper.subprocess, "run", fake_run)
+    assert clipper.detect_hw_encoder("ffmpeg") == "h264_qsv"
+
+
+def test_video_codec_args_per_encoder():
+    cfg = clipper.Config(ffmpeg_path="ffmpeg", buffer_dir=Path("b"), clips_dir=Path("c"))
+    assert clipper.video_codec_args(cfg)[:4] == ["-c:v", "libx264", "-preset", "veryfast"]
+    cfg.encoder, cfg.preset = "h264_nvenc", "p4"
+    args = clipper.video_codec_args(cfg)
+    assert args[args.index("-rc") + 1] == "cbr"
+    assert "zerolatency" not in args
+    assert args[args.index("-forced-idr") + 1] == "1"
+    for enc in ("h264_qsv", "h264_amf"):
+        cfg.encoder = enc
+        args = clipper.video_codec_args(cfg)
+        assert args[args.index("-forced_idr") + 1] == "1"
+
+
+def test_ddagrab_record_cmd(tmp_path, monkeypatch):
+    monkeypatch.setattr(clipper, "_SYSTEM", "windows")
+    monkeypatch.setattr(clipper, "_IS_WINDOWS", True)
+    cfg = clipper.Config(ffmpeg_path="ffmpeg", buffer_dir=tmp_path, clips_dir=tmp_path, use_ddagrab=True)
+    region = clipper.MonitorRegion(1920, 1080, 0, 0)
+
+    cfg.encoder, cfg.preset = "h264_nvenc", "p4"
+    cmd = clipper.Recorder(cfg, region)._build_ffmpeg_record_cmd()
+    assert any(a.startswith("ddagrab=") for a in cmd)
+    assert cmd[cmd.index("-force_key_frames") + 1] == "expr:gte(t,n_forced*10)"
+    assert "gdigrab" not in cmd and "-pix_fmt" not in cmd
+
+    cfg.encoder, cfg.preset = "libx264", "veryfast"
+    cmd = clipper.Recorder(cfg, region)._build_ffmpeg_record_cmd()
+    assert cmd[cmd.index("-vf") + 1] == "hwdownload,format=bgra"
+
+
+class _FakeProc:
+    """Stands in for asyncio.create_subprocess_exec; records concat invocations.
+    Exit codes are taken from `returncodes` in order (default 0)."""
+
+    calls = []
+    returncodes = []
+
+    def __init__(self, cmd):
+        self.cmd = cmd
+        self.returncode = None
+
+    @classmethod
+    async def exec(cls, *cmd, **kwargs):
+        return cls(list(cmd))
+
+    async def communicate(self, data=None):
+        _FakeProc.calls.append((self.cmd, data))
+        await asyncio.sleep(0.05)  # lets concurrent saves overlap
+        self.returncode = _FakeProc.returncodes.pop(0) if _FakeProc.returncodes else 0
+        if self.returncode == 0:
+            Path(self.cmd[-1]).write_bytes(b"mp4")
+        return (None, None)
+
+
+def _assembler_with_segments(tmp_path, count):
+    buf = tmp_path / "buffer"
+    buf.mkdir()
+    cfg = clipper.Config(ffmpeg_path="ffmpeg", buffer_dir=buf, clips_dir=tmp_path / "clips", clip_length=20, segment_time=10)
+    index = clipper.SegmentIndex(buf)
+    for i in range(count):
+        (buf / f"buf-{i:05d}.ts").write_bytes(b"x")
+    index.poll()
+    return clipper.ClipAssembler(cfg, index)
+
+
+def test_save_clip_streams_concat_list_on_stdin(tmp_path, monkeypatch):
+    monkeypatch.setattr(clipper.asyncio, "create_subprocess_exec", _FakeProc.exec)
+    monkeypatch.setattr(clipper, "get_active_window_title", lambda: "Game")
+    monkeypatch.setattr(clipper, "notify", lambda msg: None)
+    _FakeProc.calls, _FakeProc.returncodes = [], [0]
+    assembler = _assembler_with_segments(tmp_path, 3)
+
+    out = asyncio.run(assembler.save_clip())
+    assert out is not None and out.name.endswith("_20s_Game.mp4")
+    (cmd, data), = _FakeProc.calls
+    assert cmd[cmd.index("-i") + 1] == "pipe:0"
+    lines = data.decode().splitlines()
+    assert all(line.startswith("file 'file:") for line in lines)
+    assert [Path(line[len("file 'file:"):-1]).name for line in lines] == ["buf-00001.ts", "buf-00002.ts"]
+
+
+def test_save_clip_picks_up_segment_the_watcher_has_not_seen(tmp_path, monkeypatch):
+    monkeypatch.setattr(clipper.asyncio, "create_subprocess_exec", _FakeProc.exec)
+    monkeypatch.setattr(clipper, "get_active_window_title", lambda: "Game")
+    monkeypatch.setattr(clipper, "notify", lambda msg: None)
+    _FakeProc.calls, _FakeProc.returncodes = [], [0]
+    assembler = _assembler_with_segments(tmp_path, 2)
+    (assembler.cfg.buffer_dir / "buf-00002.ts").write_bytes(b"x")  # written after the last poll
+
+    assert asyncio.run(assembler.save_clip()) is not None
+    (_, data), = _FakeProc.calls
+    assert data.decode().splitlines()[-1].endswith("buf-00002.ts'")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs a real ffmpeg")
+def test_save_clip_with_real_ffmpeg(tmp_path, monkeypatch):
+    monkeypatch.setattr(clipper, "get_active_window_title", lambda: "Game")
+    monkeypatch.setattr(clipper, "notify", lambda msg: None)
+    buf = tmp_path / "it's buffer"  # the quote must survive concat-list escaping
+    buf.mkdir()
+    for i in range(2):
+        clipper.subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "testsrc=d=1:s=64x64:r=10",
+                "-c:v", "mpeg2video", "-f", "mpegts", str(buf / f"buf-{i:05d}.ts"),
+            ],
+            check=True,
+        )
+    index = clipper.SegmentIndex(buf)
+    index.poll()
+    cfg = clipper.Config(ffmpeg_path="ffmpeg", buffer_dir=buf, clips_dir=tmp_path / "clips", clip_length=20, segment_time=10)
+
+    out = asyncio.run(clipper.ClipAssembler(cfg, index).save_clip())
+    assert out is not None and out.stat().st_size > 0
+
+
+def test_segment_index_wait_for_change(tmp_path):
+    index = clipper.SegmentIndex(tmp_path)
+    assert index.wait_for_change(timeout=0.01) is False
+
+    def produce():
+        (tmp_path / "buf-00000.ts").write_bytes(b"x")
+        index.poll()
+
+    timer = threading.Timer(0.05, produce)
+    timer.start()
+    try:
+        assert index.wait_for_change(timeout=5) is True
+    finally:
+        timer.join()
+    assert len(index) == 1
+
+
+def test_save_clip_failure_returns_none_without_retry(tmp_path, monkeypatch):
+    monkeypatch.setattr(clipper.asyncio, "create_subprocess_exec", _FakeProc.exec)
+    monkeypatch.setattr(clipper, "get_active_window_title", lambda: "Game")
+    monkeypatch.setattr(clipper, "notify", lambda msg: None)
+    _FakeProc.calls, _FakeProc.returncodes = [], [1]
+    assembler = _assembler_with_segments(tmp_path, 2)
+
+    assert asyncio.run(assembler.save_clip()) is None
+    (copy_cmd, _), = _FakeProc.calls  # no re-encode retry
+    assert "copy" in copy_cmd
+    assert sorted(p.name for p in assembler.cfg.buffer_dir.iterdir()) == ["buf-00000.ts", "buf-00001.ts"]
+
+
+def test_capability_probe_is_cached_per_binary(tmp_path, monkeypatch):
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.write_text("v1")
+    monkeypatch.setattr(clipper, "CAP_CACHE_FILE", tmp_path / ".cap_cache.json")
+    runs = []
+
+    def fake_run(cmd, **kwargs):
+        runs.append(cmd)
+        return types.SimpleNamespace(stdout=" V....D libx264   libx264 H.264\n", returncode=0)
+
+    monkeypatch.setattr(clipper.subprocess, "run", fake_run)
+    assert "libx264" in clipper._probe_encoders(str(fake_ffmpeg))
+    assert clipper._probe_encoders(str(fake_ffmpeg)) == ["libx264"]
+    assert len(runs) == 1
+
+    # A different binary (size changes) invalidates the cache
+    fake_ffmpeg.write_text("v2 upgraded")
+    clipper._probe_encoders(str(fake_ffmpeg))
+    assert len(runs) == 2
+
+
+def test_hw_encoder_check_is_not_cached(tmp_path, monkeypatch):
+    fake_ffmpeg = tmp_path / "ffmpeg"
+    fake_ffmpeg.write_text("v1")
+    monkeypatch.setattr(clipper, "CAP_CACHE_FILE", tmp_path / ".cap_cache.json")
+    driver_ok = [False]
+    runs = []
+
+    def fake_run(cmd, **kwargs):
+        runs.append(cmd)
+        if "-encoders" in cmd:
+            return types.SimpleNamespace(stdout=" V....D h264_nvenc   NVIDIA NVENC H.264 encoder\n", returncode=0)
+        if "-filters" in cmd:
+            return types.SimpleNamespace(stdout=" ... ddagrab  |->V  Grab Windows Desktop\n", returncode=0)
+        return types.SimpleNamespace(stdout="", returncode=0 if driver_ok[0] else 1)
+
+    monkeypatch.setattr(clipper.subprocess, "run", fake_run)
+    assert clipper.detect_hw_encoder(str(fake_ffmpeg)) == "libx264"
+    driver_ok[0] = True
+    assert clipper.detect_hw_encoder(str(fake_ffmpeg)) == "h264_nvenc"
+    assert sum("-encoders" in cmd for cmd in runs) == 1  # the listing itself stays cached
+
+    assert clipper.ffmpeg_has_filter(str(fake_ffmpeg), "ddagrab")
+    cache = clipper.json.loads((tmp_path / ".cap_cache.json").read_text())
+    assert set(cache) == {"key", "encoders", "filters"}
+
+
+class _FakeRecorderProc:
+    def __init__(self, exits_on_signal):
+        self.exits_on_signal = exits_on_signal
+        self.signals = []
+        self.terminated = False
+        self.stdin = None
+        self._running = True
+
+    def poll(self):
+        return None if self._running else 0
+
+    def send_signal(self, sig):
+        self.signals.append(sig)
+        if self.exits_on_signal:
+            self._running = False
+
+    def wait(self, timeout=None):
+        if self._running:
+            raise clipper.subprocess.TimeoutExpired("ffmpeg", timeout)
+        return 0
+
+    def terminate(self):
+        self.terminated = True
+        self._running = False
+
+    def kill(self):
+        self._running = False
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX stop path")
+def test_recorder_stop_interrupts_before_terminating(tmp_path):
+    cfg = clipper.Config(ffmpeg_path="ffmpeg", buffer_dir=tmp_path, clips_dir=tmp_path)
+    rec = clipper.Recorder(cfg, clipper.MonitorRegion(1920, 1080, 0, 0))
+
+    rec.proc = proc = _FakeRecorderProc(exits_on_signal=True)
+    rec.stop()
+    assert proc.signals == [clipper.signal.SIGINT] and not proc.terminated
+
+    rec.proc = proc = _FakeRecorderProc(exits_on_signal=False)
+    rec.stop()
+    assert proc.signals == [clipper.signal.SIGINT] and proc.terminated
+
+
+def test_recorder_stop_purges_only_ram_buffer(tmp_path):
+    cfg = clipper.Config(ffmpeg_path="ffmpeg", buffer_dir=tmp_path, clips_dir=tmp_path)
+    rec = clipper.Recorder(cfg, clipper.MonitorRegion(1920, 1080, 0, 0))
+    (tmp_path / "buf-00000.ts").write_bytes(b"x")
+
+    rec.stop()
+    assert (tmp_path / "buf-00000.ts").exists()  # on-disk buffer keeps the finalized segment
+
+    cfg.buffer_in_ram = True
+    rec.stop()
+    assert not (tmp_path / "buf-00000.ts").exists()
+
+
+def test_recorder_trims_buffer_as_segments_arrive(tmp_path):
+    cfg = clipper.Config(ffmpeg_path="ffmpeg", buffer_dir=tmp_path, clips_dir=tmp_path, clip_length=20, segment_time=10)
+    rec = clipper.Recorder(cfg, clipper.MonitorRegion(1920, 1080, 0, 0))
+    assert rec.capacity == 6
+    for i in range(8):
+        (tmp_path / f"buf-{i:05d}.ts").write_bytes(b"x")
+    rec.index.poll()
+    assert len(rec.index) == 6
+    assert sorted(p.name for p in tmp_path.glob("buf-*.ts"))[0] == "buf-00002.ts"
+
+
+def test_recorder_low_space_prune_checks_buffer_volume(tmp_path, monkeypatch):
+    buffer_dir, clips_dir = tmp_path / "buffer", tmp_path / "clips"
+    buffer_dir.mkdir()
+    cfg = clipper.Config(ffmpeg_path="ffmpeg", buffer_dir=buffer_dir, clips_dir=clips_dir, clip_length=20, segment_time=10)
+    rec = clipper.Recorder(cfg, clipper.MonitorRegion(1920, 1080, 0, 0))
+    used_elsewhere = [0]
+
+    def fake_free(path):
+        if path == clips_dir:
+            return 0  # a full clips disk must not shrink the buffer
+        # 7 GiB buffer volume; each buffered segment uses 1 GiB
+        return (7 - used_elsewhere[0] - len(rec.index)) * 1024 ** 3
+
+    monkeypatch.setattr(clipper, "_free_bytes", fake_free)
+    segments = iter(range(100))
+
+    def add(n):
+        for _ in range(n):
+            (buffer_dir / f"buf-{next(segments):05d}.ts").write_bytes(b"x")
+            rec.index.poll()
+
+    add(5)
+    assert len(rec.index) == 5  # 2 GiB free: at the threshold, nothing pruned
+
+    add(4)
+    assert len(rec.index) == 5  # every new segment is matched by a prune, below capacity (6)
+
+    used_elsewhere[0] = 3
+    add(1)
+    assert len(rec.index) == 2  # pruned repeatedly until free space recovered
+    assert fake_free(buffer_dir) >= cfg.min_free_gb * 1024 ** 3
+
+
+def test_submitted_saves_run_concurrently_with_unique_names(tmp_path, monkeypatch):
+    monkeypatch.setattr(clipper.asyncio, "create_subprocess_exec", _FakeProc.exec)
+    monkeypatch.setattr(clipper, "get_active_window_title", lambda: "Game")
+    monkeypatch.setattr(clipper, "notify", lambda msg: None)
+    _FakeProc.calls, _FakeProc.returncodes = [], []
+    assembler = _assembler_with_segments(tmp_path, 2)
+
+    assembler.start()
+    try:
+        assembler.submit(10)
+        assembler.submit(10)
+    finally:
+        assembler.stop()  # waits for in-flight saves
+    outputs = [cmd[-1] for cmd, _ in _FakeProc.calls]
+    assert len(outputs) == 2 and len(set(outputs)) == 2
+
+
+class _HangingProc:
+    """A concat FFmpeg that never finishes on its own; records whether it was killed."""
+
+    started = threading.Event()
+    killed = []
+
+    def __init__(self, cmd):
+        self.cmd = cmd
+        self.returncode = None
+
+    @classmethod
+    async def exec(cls, *cmd, **kwargs):
+        return cls(list(cmd))
+
+    async def communicate(self, data=None):
+        Path(self.cmd[-1]).write_bytes(b"partial")
+        _HangingProc.started.set()
+        await asyncio.sleep(3600)
+
+    def kill(self):
+        _HangingProc.killed.append(self.cmd[-1])
+        self.returncode = -9
+
+    async def wait(self):
+        return self.returncode
+
+
+def test_stop_cancels_saves_that_outlive_the_timeout(tmp_path, monkeypatch):
+    monkeypatch.setattr(clipper.asyncio, "create_subprocess_exec", _HangingProc.exec)
+    monkeypatch.setattr(clipper, "get_active_window_title", lambda: "Game")
+    monkeypatch.setattr(clipper, "notify", lambda msg: None)
+    _HangingProc.started.clear()
+    _HangingProc.killed = []
+    assembler = _assembler_with_segments(tmp_path, 2)
+
+    assembler.start()
+    assembler.submit(10)
+    assert _HangingProc.started.wait(5)
+    assembler.stop(timeout=0.1)
+    assert not assembler._thread.is_alive()
+    (out,) = _HangingProc.killed
+    assert not Path(out).exists()  # partial clip removed
+
+
+def test_status_loop_writes_only_on_change(tmp_path, monkeypatch):
+    writes = []
+    monkeypatch.setattr(clipper.sys, "stdout", types.SimpleNamespace(write=writes.append, flush=lambda: None))
+    monkeypatch.setattr(clipper, "_free_bytes", lambda path: 5 * 1024 ** 3)
+    cfg = clipper.Config(ffmpeg_path="ffmpeg", buffer_dir=tmp_path, clips_dir=tmp_path)
+    index = clipper.SegmentIndex(tmp_path)
+    stop = threading.Event()
+    waits = []
+
+    def fake_wait(timeout=None):
+        waits.append(timeout)
+        if len(waits) == 2:
+            (tmp_path / "buf-00000.ts").write_bytes(b"x")
+            index.poll()
+        if len(waits) == 3:
+            stop.set()
+        return False
+
+    monkeypatch.setattr(index, "wait_for_change", fake_wait)
+    clipper.status_loop(cfg, index, stop)
+    lines = [w for w in writes if w.startswith("\r")]
+    assert len(lines) == 2  # initial render + one after the new segment
+    assert lines[0].startswith("\rRecording") and "segments ~1" in lines[1]
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX ownership check")
+def test_pick_buffer_dir_prefers_tmpfs_with_room(tmp_path, monkeypatch):
+    monkeypatch.setattr(clipper, "_SYSTEM", "linux")
+    monkeypatch.setattr(clipper, "_IS_WINDOWS", False)
+    monkeypatch.setattr(clipper, "SHM_DIR", tmp_path / "shm")
+    (tmp_path / "shm").mkdir()
+    (tmp_path / "run").mkdir()
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+
+    monkeypatch.setattr(clipper, "_free_bytes", lambda path: 64 * 1024 ** 3)
+    assert clipper.pick_buffer_dir(120, 10) == tmp_path / "run" / "clipper"
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert clipper.pick_buffer_dir(120, 10) == tmp_path / "shm" / f"clipper-{os.getuid()}"
+
+    monkeypatch.setattr(clipper, "_free_bytes", lambda path: 256 * 1024 ** 2)
+    assert clipper.pick_buffer_dir(120, 10) == clipper.BUFFER_DIR
+
+    monkeypatch.setattr(clipper, "_SYSTEM", "windows")
+    monkeypatch.setattr(clipper, "_IS_WINDOWS", True)
+    monkeypatch.setattr(clipper, "_free_bytes", lambda path: 64 * 1024 ** 3)
+    assert clipper.pick_buffer_dir(120, 10) == clipper.BUFFER_DIR
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX ownership check")
+def test_pick_buffer_dir_rejects_unsafe_shm_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(clipper, "_SYSTEM", "linux")
+    monkeypatch.setattr(clipper, "_IS_WINDOWS", False)
+    monkeypatch.setattr(clipper, "SHM_DIR", tmp_path)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(clipper, "_free_bytes", lambda path: 64 * 1024 ** 3)
+    target = tmp_path / f"clipper-{os.getuid()}"
+
+    # pre-created by someone else as a symlink to their directory
+    (tmp_path / "elsewhere").mkdir(mode=0o700)
+    target.symlink_to(tmp_path / "elsewhere")
+    assert clipper.pick_buffer_dir(120, 10) == clipper.BUFFER_DIR
+    target.unlink()
+
+    # readable by other users
+    target.mkdir()
+    target.chmod(0o755)
+    assert clipper.pick_buffer_dir(120, 10) == clipper.BUFFER_DIR
+
+    # owned by another user
+    target.chmod(0o700)
+    real_uid = os.getuid()
+    monkeypatch.setattr(clipper.os, "getuid", lambda: real_uid + 1)
+    assert clipper.pick_buffer_dir(120, 10) == clipper.BUFFER_DIR
+
+    monkeypatch.setattr(clipper.os, "getuid", lambda: real_uid)
+    assert clipper.pick_buffer_dir(120, 10) == target
+    assert target.stat().st_mode & 0o777 == 0o700